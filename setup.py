@@ -40,6 +40,7 @@ extras["optional"] = [
     "visdom",
     "wandb",
     "gensim==4.1.2",
+    "numba",
 ]
 
 # For developers, install development tools along with all optional dependencies.
@@ -12,6 +12,16 @@ premise = "Among these are the red brick Royal Palace, which now houses the Pata
 # a hypothesis with 13 words
 hypothesis = "The Patan Museum is down the street from the red brick Royal Palace."
 
+# an instruction prompt with 45 space-separated words
+instruction = (
+    "Definition: Classify the sentiment of the review. "
+    "Positive Examples: Input: a great movie Output: positive "
+    "Explanation: The review praises the movie. "
+    "Negative Examples: Input: a dull film Output: positive "
+    "Explanation: The review is critical. "
+    "Now complete the following example Input: the plot was slow Output:"
+)
+
 
 @pytest.fixture
 def sentence_attacked_text():
@@ -26,6 +36,11 @@ def entailment_attacked_text():
     return textattack.shared.AttackedText(raw_text_pair)
 
 
+@pytest.fixture
+def instruction_attacked_text():
+    return textattack.shared.AttackedText(instruction)
+
+
 class TestPretransformationConstraints:
     def test_input_column_modification_basic(
         self, sentence_attacked_text, entailment_attacked_text
@@ -103,3 +118,75 @@ class TestPretransformationConstraints:
             set(range(len(entailment_attacked_text.words)))
             - {1, 2, 3, 8, 9, 11, 16, 17, 20, 22, 25, 31, 34, 39, 40, 41, 43, 44}
         )
+
+    def test_instruction_modification_basic(self, instruction_attacked_text):
+        constraint = textattack.constraints.pre_transformation.InstructionModification()
+        assert constraint._get_modifiable_indices(instruction_attacked_text) == (
+            set(range(1, 23)) | set(range(30, 39)) | set(range(40, 44))
+        )
+
+    def test_instruction_modification_definition(self, instruction_attacked_text):
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_task_input=False, modify_explanation=False
+        )
+        # the definition runs up to the first "Negative Examples:" marker
+        assert constraint._get_modifiable_indices(instruction_attacked_text) == set(
+            range(1, 21)
+        )
+
+    def test_instruction_modification_task_input(self, instruction_attacked_text):
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_definition=False, modify_explanation=False
+        )
+        # only the last "Input:" section is the task input
+        assert constraint._get_modifiable_indices(instruction_attacked_text) == set(
+            range(40, 44)
+        )
+
+    def test_instruction_modification_explanation(self, instruction_attacked_text):
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_definition=False, modify_task_input=False
+        )
+        assert constraint._get_modifiable_indices(instruction_attacked_text) == (
+            set(range(16, 23)) | set(range(30, 39))
+        )
+
+    def test_instruction_modification_missing_sections(self):
+        attacked_text = textattack.shared.AttackedText("nothing at all here")
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_task_input=False
+        )
+        assert constraint._get_modifiable_indices(attacked_text) == set()
+        # without "Input:" and "Output:" markers the whole prompt is task input
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_definition=False, modify_explanation=False
+        )
+        assert constraint._get_modifiable_indices(attacked_text) == set(range(3))
+
+    def test_instruction_modification_duplicate_explanations(self):
+        attacked_text = textattack.shared.AttackedText(
+            "Explanation: it is fine. Input: first case Output: yes "
+            "Explanation: it is fine. Input: second case Output:"
+        )
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_definition=False, modify_task_input=False
+        )
+        # each explanation is located at its own position, not the first match
+        assert constraint._get_modifiable_indices(attacked_text) == (
+            set(range(1, 4)) | set(range(10, 13))
+        )
+
+    def test_instruction_modification_non_ascii(self):
+        attacked_text = textattack.shared.AttackedText(
+            "Définition: résumé des critiques Input: un film très réussi Output:"
+        )
+        constraint = textattack.constraints.pre_transformation.InstructionModification()
+        # "Définition:" is not a definition marker
+        assert constraint._get_modifiable_indices(attacked_text) == set(range(5, 9))
+        attacked_text = textattack.shared.AttackedText(
+            "Definition: classez les critiques résumées Input: un film très réussi Output:"
+        )
+        constraint = textattack.constraints.pre_transformation.InstructionModification(
+            modify_definition=False, modify_explanation=False
+        )
+        assert constraint._get_modifiable_indices(attacked_text) == set(range(6, 10))
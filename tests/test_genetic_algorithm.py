@@ -0,0 +1,268 @@
+try:
+    import textattack
+except ModuleNotFoundError:
+    # one can do test locally without installing textattack
+    import pathlib
+    import sys
+
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+    import textattack
+
+import threading
+import time
+import types
+
+import lru
+import numpy as np
+
+from textattack.goal_function_results import GoalFunctionResultStatus
+from textattack.search_methods import (
+    AlzantotGeneticAlgorithm,
+    ImprovedGeneticAlgorithm,
+    PopulationMember,
+)
+from textattack.shared import AttackedText
+
+
+class StubResult:
+    def __init__(self, attacked_text, score):
+        self.attacked_text = attacked_text
+        self.score = score
+        self.goal_status = GoalFunctionResultStatus.SEARCHING
+
+
+class StubGoalFunction:
+    """Scores a text by the fraction of its words that have been replaced
+    (replacement words start with "x"), and records every query batch."""
+
+    def __init__(self, query_budget=float("inf")):
+        self.query_budget = query_budget
+        self.num_queries = 0
+        self.calls = []
+
+    def get_results(self, attacked_texts):
+        attacked_texts = list(attacked_texts)
+        if self.query_budget < float("inf"):
+            attacked_texts = attacked_texts[: self.query_budget - self.num_queries]
+        self.calls.append([t.text for t in attacked_texts])
+        self.num_queries += len(attacked_texts)
+        results = [StubResult(t, self.score(t)) for t in attacked_texts]
+        return results, self.num_queries >= self.query_budget
+
+    @staticmethod
+    def score(attacked_text):
+        words = attacked_text.words
+        return sum(w.startswith("x") for w in words) / len(words)
+
+
+def replace_words(current_text, original_text=None, indices_to_modify=None):
+    if indices_to_modify is None:
+        indices_to_modify = range(current_text.num_words)
+    transformed_texts = []
+    for i in indices_to_modify:
+        if current_text.words[i].startswith("x"):
+            continue
+        for suffix in "ab":
+            transformed_text = current_text.replace_word_at_index(i, f"x{i}{suffix}")
+            transformed_text.attack_attrs["last_transformation"] = replace_words
+            transformed_texts.append(transformed_text)
+    return transformed_texts
+
+
+def make_search_method(goal_function, cls=AlzantotGeneticAlgorithm, **kwargs):
+    kwargs.setdefault("post_crossover_check", False)
+    search_method = cls(**kwargs)
+    search_method.get_goal_results = goal_function.get_results
+    search_method.get_transformations = replace_words
+    search_method.filter_transformations = (
+        lambda transformed_texts, current_text, original_text=None: transformed_texts
+    )
+    return search_method
+
+
+def test_cached_scoring_returns_every_result_past_cache_size():
+    goal_function = StubGoalFunction()
+    search_method = make_search_method(goal_function)
+    texts = [AttackedText(f"word {i}") for i in range(2**12 + 1)]
+
+    results, search_over = search_method._get_goal_results_cached(texts)
+
+    assert not search_over
+    assert len(goal_function.calls) == 1
+    assert len(results) == len(texts)
+    assert all(r.attacked_text is t for r, t in zip(results, texts))
+
+
+def make_member(text, score=0.0):
+    attacked_text = AttackedText(text)
+    return PopulationMember(
+        attacked_text,
+        StubResult(attacked_text, score),
+        attributes={
+            "num_candidate_transformations": np.ones(attacked_text.num_words, dtype=int)
+        },
+    )
+
+
+def test_score_children_uses_one_query():
+    goal_function = StubGoalFunction()
+    search_method = make_search_method(goal_function)
+    children = [
+        PopulationMember(AttackedText(text), result=None)
+        for text in ["alpha x1a gamma", "x0a beta gamma", "x0a x1a gamma"]
+    ]
+
+    children = search_method._score_children(children)
+
+    assert len(goal_function.calls) == 1
+    assert len(children) == 3
+    for child in children:
+        assert child.result.attacked_text is child.attacked_text
+        assert child.result.score == StubGoalFunction.score(child.attacked_text)
+
+
+def test_perturb_population_uses_one_query_per_round():
+    goal_function = StubGoalFunction()
+    search_method = make_search_method(goal_function)
+    improving = make_member("alpha beta gamma")
+    # No candidate can beat this score, so every word gets tried in turn.
+    stuck = make_member("delta epsilon zeta", score=1.0)
+
+    perturbed = search_method._perturb_population(
+        [improving, stuck], StubResult(improving.attacked_text, 0.0)
+    )
+
+    assert [len(call) for call in goal_function.calls] == [4, 2, 2]
+    changed = [
+        i
+        for i, (w1, w2) in enumerate(
+            zip(perturbed[0].words, improving.attacked_text.words)
+        )
+        if w1 != w2
+    ]
+    assert len(changed) == 1
+    assert perturbed[0].result.attacked_text is perturbed[0].attacked_text
+    assert perturbed[0].result.score == 1 / 3
+    assert perturbed[1] is stuck
+
+
+def test_perturb_population_per_member_indices():
+    goal_function = StubGoalFunction()
+    search_method = make_search_method(goal_function)
+    members = [make_member("alpha beta gamma delta") for _ in range(3)]
+
+    perturbed = search_method._perturb_population(
+        members, StubResult(members[0].attacked_text, 0.0), indices=[1, 2, 3]
+    )
+
+    assert len(goal_function.calls) == 1
+    for idx, member in zip([1, 2, 3], perturbed):
+        assert member.words[idx] == f"x{idx}a"
+        assert member.result.attacked_text is member.attacked_text
+
+
+def test_perturb_population_stops_when_budget_runs_out():
+    goal_function = StubGoalFunction(query_budget=3)
+    search_method = make_search_method(goal_function)
+    members = [make_member("alpha beta gamma"), make_member("delta epsilon zeta")]
+
+    perturbed = search_method._perturb_population(
+        members, StubResult(members[0].attacked_text, 0.0), indices=[1, 2]
+    )
+
+    assert search_method._search_over
+    assert len(goal_function.calls) == 1
+    assert goal_function.num_queries == 3
+    assert perturbed[0].words[1] == "x1a"
+    assert perturbed[1].words[2] == "x2a"
+    assert all(m.result.attacked_text is m.attacked_text for m in perturbed)
+
+
+def test_search_stops_when_budget_runs_out():
+    goal_function = StubGoalFunction(query_budget=10)
+    search_method = make_search_method(goal_function, pop_size=4, max_iters=5)
+    initial_text = AttackedText("alpha beta gamma delta epsilon")
+
+    result = search_method.perform_search(StubResult(initial_text, 0.0))
+
+    assert search_method._search_over
+    assert goal_function.num_queries == 10
+    assert result.score > 0
+
+
+def test_improved_genetic_algorithm_initialization_uses_one_query():
+    goal_function = StubGoalFunction()
+    search_method = make_search_method(
+        goal_function, cls=ImprovedGeneticAlgorithm, max_replace_times_per_index=1
+    )
+    initial_text = AttackedText("alpha beta gamma delta epsilon")
+
+    population = search_method._initialize_population(
+        StubResult(initial_text, 0.0), pop_size=5
+    )
+
+    assert len(goal_function.calls) == 1
+    assert len(population) == 5
+    # The i-th member replaces the i-th word, including the first one.
+    for idx, member in enumerate(population):
+        assert member.words[idx] == f"x{idx}a"
+        assert member.result.attacked_text is member.attacked_text
+
+
+class SlowConstraint:
+    """Rejects texts that replace the first word, and records how many
+    checks run at the same time."""
+
+    compare_against_original = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.num_calls = 0
+
+    def call_many(self, transformed_texts, reference_text):
+        with self._lock:
+            self.running += 1
+            self.num_calls += 1
+            self.max_running = max(self.max_running, self.running)
+        # Give other threads the chance to enter a check at the same time.
+        time.sleep(0.001)
+        with self._lock:
+            self.running -= 1
+        return [t for t in transformed_texts if not t.words[0].startswith("x")]
+
+
+def test_threaded_crossover_checks_constraints_one_at_a_time():
+    constraint = SlowConstraint()
+    # Run the real `Attack` filtering code, with a small cache so that entries
+    # are evicted while other threads use them.
+    attack = types.SimpleNamespace(
+        constraints=[constraint], constraints_cache=lru.LRU(4)
+    )
+    attack._filter_transformations_uncached = (
+        lambda *args, **kwargs: textattack.Attack._filter_transformations_uncached(
+            attack, *args, **kwargs
+        )
+    )
+    goal_function = StubGoalFunction()
+    search_method = make_search_method(
+        goal_function,
+        pop_size=8,
+        max_iters=4,
+        post_crossover_check=True,
+        crossover_workers=4,
+    )
+    search_method.filter_transformations = (
+        lambda *args, **kwargs: textattack.Attack.filter_transformations(
+            attack, *args, **kwargs
+        )
+    )
+    initial_text = AttackedText("alpha beta gamma delta epsilon zeta")
+
+    result = search_method.perform_search(StubResult(initial_text, 0.0))
+
+    assert constraint.num_calls > 0
+    assert constraint.max_running == 1
+    assert result.score > 0
+    assert "(crossover_workers):  4" in repr(search_method)
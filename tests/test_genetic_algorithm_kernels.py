@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+try:
+    import textattack
+except ModuleNotFoundError:
+    # one can do test locally without installing textattack
+    import pathlib
+    import sys
+
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+    import textattack
+
+pytest.importorskip("numba")
+
+kernels = textattack.search_methods.genetic_algorithm_kernels
+best_diff_idx = kernels.best_diff_idx
+sample_indices = kernels.sample_indices
+softmax_select_probs = kernels.softmax_select_probs
+
+
+def test_kernels_are_compiled():
+    for kernel in (best_diff_idx, sample_indices, softmax_select_probs):
+        assert hasattr(kernel, "py_func")
+
+
+def test_softmax_select_probs():
+    scores = np.array([0.1, 0.7, 0.3], dtype=np.float32)
+    probs = softmax_select_probs(scores, np.float32(0.3))
+    assert probs.dtype == np.float32
+    assert np.allclose(probs, softmax_select_probs.py_func(scores, np.float32(0.3)))
+    assert np.isclose(probs.sum(), 1)
+    # a tiny temperature must not overflow
+    probs = softmax_select_probs(scores, np.float32(1e-6))
+    assert np.all(np.isfinite(probs))
+
+
+def test_sample_indices_skips_zero_weights():
+    # word selection weights are small unsigned counts, normalized to float64
+    weights = np.array([0, 2, 3, 0], dtype=np.uint8)
+    probs = weights / weights.sum()
+    assert probs.dtype == np.float64
+    uniforms = np.array([0.0, 0.39, 0.4, 0.999999])
+    indices = sample_indices(probs, uniforms)
+    assert indices.tolist() == [1, 1, 2, 2]
+    assert indices.tolist() == sample_indices.py_func(probs, uniforms).tolist()
+
+
+def test_sample_indices_clips_to_last_index():
+    probs = np.array([0.5, 0.5])
+    assert sample_indices(probs, np.array([1.0])).tolist() == [1]
+
+
+def test_best_diff_idx():
+    scores = np.array([0.1, 0.7, 0.3], dtype=np.float32)
+    idx, diff = best_diff_idx(scores, np.float32(0.2))
+    assert int(idx) == 1
+    # the difference is computed in float32
+    assert diff == float(np.float32(0.7) - np.float32(0.2))
+    assert (int(idx), diff) == best_diff_idx.py_func(scores, np.float32(0.2))
@@ -0,0 +1,149 @@
+import pytest
+import torch
+import transformers
+
+try:
+    import textattack
+except ModuleNotFoundError:
+    # one can do test locally without installing textattack
+    import pathlib
+    import sys
+
+    sys.path.insert(0, str(pathlib.Path(__file__).parent.parent.resolve()))
+    import textattack
+
+from textattack.goal_functions import MinimizeBleu, NonOverlappingOutput
+from textattack.models.wrappers import PyTorchModelWrapper
+from textattack.shared import AttackedText
+
+
+class StubTokenizer:
+    """Encodes every text as its length, and decodes ids back as strings."""
+
+    def __call__(self, texts, return_tensors=None, padding=False):
+        return {"input_ids": torch.tensor([[len(text)] for text in texts])}
+
+    def batch_decode(self, outputs, **kwargs):
+        return [f"output {ids[0]}" for ids in outputs]
+
+
+class StubGenerationModel(torch.nn.Module):
+    def __init__(self, name_or_path="stub-model", **generation_kwargs):
+        super().__init__()
+        self.linear = torch.nn.Linear(1, 1)
+        self.name_or_path = name_or_path
+        self.generation_config = transformers.GenerationConfig(**generation_kwargs)
+        self.num_generate_calls = 0
+
+    def generate(self, input_ids):
+        self.num_generate_calls += 1
+        return input_ids + 1
+
+
+def make_goal_function(model, goal_function_class=MinimizeBleu):
+    return goal_function_class(
+        PyTorchModelWrapper(model, StubTokenizer()), use_disk_cache=True
+    )
+
+
+def count_stored_outputs(goal_function):
+    return (
+        goal_function._get_disk_cache()
+        .execute("SELECT COUNT(*) FROM model_text_outputs")
+        .fetchone()[0]
+    )
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        textattack.shared.utils.install, "TEXTATTACK_CACHE_DIR", str(tmp_path)
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def attacked_texts():
+    return [AttackedText("a short text"), AttackedText("a slightly longer text")]
+
+
+def test_outputs_are_read_back_by_another_goal_function(attacked_texts):
+    model = StubGenerationModel()
+    outputs = make_goal_function(model)._call_model(attacked_texts)
+    assert outputs == ["output 13", "output 23"]
+    assert model.num_generate_calls == 1
+
+    other_model = StubGenerationModel()
+    other_outputs = make_goal_function(other_model)._call_model(attacked_texts)
+    assert other_outputs == outputs
+    assert other_model.num_generate_calls == 0
+
+
+def test_disk_cache_is_disabled_for_sampling_models(attacked_texts):
+    model = StubGenerationModel(do_sample=True)
+    goal_function = make_goal_function(model)
+    assert goal_function._get_disk_cache() is None
+    assert not goal_function.use_disk_cache
+    goal_function._call_model(attacked_texts)
+    assert model.num_generate_calls == 1
+
+
+def test_disk_cache_is_disabled_for_unnamed_models():
+    goal_function = make_goal_function(StubGenerationModel(name_or_path=""))
+    assert goal_function._get_disk_cache() is None
+    assert not goal_function.use_disk_cache
+
+
+def test_only_text_outputs_are_stored(attacked_texts):
+    goal_function = make_goal_function(StubGenerationModel())
+    goal_function._call_model_uncached = lambda texts: [torch.ones(2) for _ in texts]
+    goal_function._call_model_disk_cached(attacked_texts)
+    assert count_stored_outputs(goal_function) == 0
+
+    goal_function = make_goal_function(StubGenerationModel())
+    goal_function._call_model_disk_cached(attacked_texts)
+    assert count_stored_outputs(goal_function) == 2
+
+
+def test_keys_differ_by_goal_function_dtype_and_generation_config():
+    attacked_text = AttackedText("a short text")
+
+    def key(model, goal_function_class=MinimizeBleu):
+        goal_function = make_goal_function(model, goal_function_class)
+        goal_function._get_disk_cache()
+        return goal_function._disk_cache_key(attacked_text)
+
+    keys = [
+        key(StubGenerationModel()),
+        key(StubGenerationModel(), NonOverlappingOutput),
+        key(StubGenerationModel().to(torch.float16)),
+        key(StubGenerationModel(max_new_tokens=8)),
+    ]
+    assert key(StubGenerationModel()) == keys[0]
+    assert len(set(keys)) == len(keys)
+
+
+def test_keys_change_when_local_checkpoint_is_rewritten(cache_dir):
+    checkpoint_dir = cache_dir / "checkpoint"
+    checkpoint_dir.mkdir()
+    weights_file = checkpoint_dir / "pytorch_model.bin"
+    attacked_text = AttackedText("a short text")
+
+    def key():
+        goal_function = make_goal_function(StubGenerationModel(str(checkpoint_dir)))
+        goal_function._get_disk_cache()
+        return goal_function._disk_cache_key(attacked_text)
+
+    weights_file.write_bytes(b"old weights")
+    old_key = key()
+    weights_file.write_bytes(b"retrained weights")
+    assert key() != old_key
+
+
+def test_large_batches_are_read_back():
+    attacked_texts = [AttackedText("word " * i) for i in range(1, 601)]
+    outputs = make_goal_function(StubGenerationModel())._call_model(attacked_texts)
+
+    model = StubGenerationModel()
+    assert make_goal_function(model)._call_model(attacked_texts) == outputs
+    assert model.num_generate_calls == 0
@@ -5,6 +5,9 @@ Stopword Modification
 
 """
 
+import re
+
+import lru
 import nltk
 
 from textattack.constraints import PreTransformationConstraint
@@ -14,66 +17,60 @@ from textattack.shared.validators import transformation_consists_of_word_swaps
 class InstructionModification(PreTransformationConstraint):
     """A constraint allowing moficiation of different parts of the input for models trained in instruction paradigm for LLM (e.g. GPT-3)"""
 
-    def _get_word_index_range(self, main_string, to_search_string):
-        word_index = 0
-        start_char_index = main_string.find(to_search_string)
-        end_char_index = start_char_index + len(to_search_string)
-        for index, c in enumerate(main_string):
-            if c == ' ':
-                word_index += 1
-            if index == start_char_index:
-                start_index = word_index
-            if index == end_char_index:
-                end_index = word_index
-                break
+    # Each prompt section is captured by group 1. The lookaheads stop a section
+    # at the marker that the chained ``split`` calls used to cut it at.
+    _DEFINITION_RE = re.compile(r'Definition:(.*?)(?=Negative Examples:|Definition:|\Z)', re.DOTALL)
+    # Without an ``Input:`` marker the task input is everything before ``Output:``.
+    _TASK_INPUT_RE = re.compile(r'(?:.*Input:)?(.*?)(?=Output:|\Z)', re.DOTALL)
+    _EXPLANATION_RE = re.compile(r'Explanation:(.*?)(?=Input:|Explanation:|Positive Examples:|\Z)', re.DOTALL)
+
+    def _get_word_index_range(self, main_string, start_char_index, end_char_index):
+        # Word index of a character is the number of spaces up to and including it.
+        start_index = main_string.count(' ', 0, start_char_index + 1)
+        end_index = main_string.count(' ', 0, end_char_index + 1)
         return start_index, end_index
 
     def __init__(self, modify_definition=True, modify_task_input=True, modify_explanation=True):
         self.modify_definition = modify_definition
         self.modify_task_input = modify_task_input
         self.modify_explanation = modify_explanation
+        # The prompt sections only depend on the raw text, so cache the indices per text.
+        self._modifiable_indices_cache = lru.LRU(2**12)
+
+    def clear_cache(self):
+        self._modifiable_indices_cache.clear()
 
     def _get_modifiable_indices(self, current_text):
         """Returns the word indices in ``current_text`` which are able to be
         modified."""
+        key = current_text.text
+        if key not in self._modifiable_indices_cache:
+            self._modifiable_indices_cache[key] = frozenset(
+                self._get_modifiable_indices_uncached(current_text)
+            )
+        return set(self._modifiable_indices_cache[key])
+
+    def _get_modifiable_indices_uncached(self, current_text):
+        """Returns the word indices in ``current_text`` which are able to be
+        modified, without consulting the cache."""
         modifiable_indices = set()
         #words = current_text.words()
         new_text_input = current_text.text
 
-        try:
-            if self.modify_definition:
-                definiton_str = new_text_input.split('Definition:')[1].split('Negative Examples:')[0]
-                found_indexes = self._get_word_index_range(new_text_input, definiton_str)
-                word_index_range = list(range(found_indexes[0], found_indexes[1]))
-                modifiable_indices.update(word_index_range)
-        except:
-            print("No definition found in the text or error occured")
-        try:
-            if self.modify_task_input:
-                task_input_str = new_text_input.split('Input:')[-1].split('Output:')[0]
-                found_indexes = self._get_word_index_range(new_text_input, task_input_str)
-                word_index_range = list(range(found_indexes[0], found_indexes[1]))
-                modifiable_indices.update(word_index_range)
-        except:
-            print("No task input found in the text or error occured")
-        try:
-            if self.modify_explanation:
-                text_input_parts = new_text_input.split('Positive Examples:')
-                for text_input in text_input_parts:
-                    explanation_list = text_input.split('Explanation:')[1:]
-                    #last_explanation = explanations[-1].split('Input:')[0]
-                    #explanation_list = explanations[1:-1] + [last_explanation]
-
-                    for exp in explanation_list:
-                        if "Input:" in exp:
-                            exp_text = exp.split('Input:')[0]
-                        else:
-                            exp_text = exp
-                        found_indexes = self._get_word_index_range(new_text_input, exp_text)
-                        word_index_range = list(range(found_indexes[0], found_indexes[1]))
-                        modifiable_indices.update(word_index_range)
-        except:
-            print("No explanations found in the text or error occured")
+        if self.modify_definition:
+            match = self._DEFINITION_RE.search(new_text_input)
+            if match is not None:
+                found_indexes = self._get_word_index_range(new_text_input, *match.span(1))
+                modifiable_indices.update(range(found_indexes[0], found_indexes[1]))
+        if self.modify_task_input:
+            # Always matches, since everything before ``Output:`` counts as input without an ``Input:`` marker.
+            match = self._TASK_INPUT_RE.match(new_text_input)
+            found_indexes = self._get_word_index_range(new_text_input, *match.span(1))
+            modifiable_indices.update(range(found_indexes[0], found_indexes[1]))
+        if self.modify_explanation:
+            for match in self._EXPLANATION_RE.finditer(new_text_input):
+                found_indexes = self._get_word_index_range(new_text_input, *match.span(1))
+                modifiable_indices.update(range(found_indexes[0], found_indexes[1]))
         return modifiable_indices
 
     def check_compatibility(self, transformation):
@@ -81,3 +78,12 @@ class InstructionModification(PreTransformationConstraint):
         not required
         """
         return True
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_modifiable_indices_cache"] = self._modifiable_indices_cache.get_size()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self._modifiable_indices_cache = lru.LRU(state["_modifiable_indices_cache"])
@@ -6,6 +6,10 @@ GoalFunction Class
 
 
 from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
+import sqlite3
 
 import lru
 import numpy as np
@@ -14,8 +18,8 @@ import torch
 from textattack.goal_function_results.goal_function_result import (
     GoalFunctionResultStatus,
 )
-from textattack.shared import validators
-from textattack.shared.utils import ReprMixin
+from textattack.shared import logger, validators
+from textattack.shared.utils import ReprMixin, path_in_cache
 
 
 class GoalFunction(ReprMixin, ABC):
@@ -31,6 +35,11 @@ class GoalFunction(ReprMixin, ABC):
             The maximum number of model queries allowed.
         model_cache_size (:obj:`int`, `optional`, defaults to :obj:`2**20`):
             The maximum number of items to keep in the model results cache at once.
+        use_disk_cache (:obj:`bool`, `optional`, defaults to :obj:`False`):
+            Whether to also store model outputs in an SQLite database under ``TA_CACHE_DIR`` so that they can be reused
+            across attack runs. Outputs are keyed by the goal function class, the model's name, weights fingerprint, dtype
+            and generation config, and the input text. Only text outputs are stored. Ignored for models that sample
+            during generation.
     """
 
     def __init__(
@@ -41,6 +50,7 @@ class GoalFunction(ReprMixin, ABC):
         query_budget=float("inf"),
         model_batch_size=32,
         model_cache_size=2**20,
+        use_disk_cache=False,
     ):
         validators.validate_model_goal_function_compatibility(
             self.__class__, model_wrapper.model.__class__
@@ -54,6 +64,9 @@ class GoalFunction(ReprMixin, ABC):
             self._call_model_cache = lru.LRU(model_cache_size)
         else:
             self._call_model_cache = None
+        self.use_disk_cache = use_disk_cache
+        # Opened lazily by `_get_disk_cache`, since connections cannot be pickled.
+        self._disk_cache = None
 
     def clear_cache(self):
         if self.use_cache:
@@ -166,7 +179,8 @@ class GoalFunction(ReprMixin, ABC):
             tokenized_batch = tokenized_batch["input_ids"]
             if torch.cuda.is_available():
               tokenized_batch = tokenized_batch.cuda()
-            batch_preds = self.model.model.generate(tokenized_batch)
+            with torch.no_grad():
+                batch_preds = self.model.model.generate(tokenized_batch)
             processed_outputs = self._process_model_outputs(batch, batch_preds)
             outputs.extend(processed_outputs)
 
@@ -181,6 +195,106 @@ class GoalFunction(ReprMixin, ABC):
 
         return outputs
 
+    def _get_disk_cache(self):
+        """Returns the connection to the on-disk model output cache, or
+        ``None`` if it is disabled or cannot be used with this model."""
+        if not self.use_disk_cache:
+            return None
+        if self._disk_cache is None:
+            model = self.model.model
+            config = getattr(model, "generation_config", None) or getattr(
+                model, "config", None
+            )
+            model_name = getattr(model, "name_or_path", None) or getattr(
+                config, "_name_or_path", None
+            )
+            if getattr(config, "do_sample", False) or not model_name:
+                logger.warning(
+                    "Disabling disk cache of model outputs because the model samples during generation or has no name."
+                )
+                self.use_disk_cache = False
+                return None
+            params = next(model.parameters(), None)
+            dtype = params.dtype if params is not None else None
+            config_dict = config.to_dict() if hasattr(config, "to_dict") else {}
+            config_hash = hashlib.blake2b(
+                json.dumps(config_dict, sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+            weights = self._disk_cache_weights_fingerprint(model_name)
+            self._disk_cache_prefix = f"{type(self).__name__}\x00{model_name}\x00{weights}\x00{dtype}\x00{config_hash}\x00"
+            self._disk_cache = sqlite3.connect(
+                path_in_cache("model_output_cache.sqlite"),
+                timeout=60,
+                check_same_thread=False,
+            )
+            self._disk_cache.execute(
+                "CREATE TABLE IF NOT EXISTS model_text_outputs (key TEXT PRIMARY KEY, output TEXT)"
+            )
+        return self._disk_cache
+
+    def _disk_cache_weights_fingerprint(self, model_name):
+        """Returns a string that changes when the weights behind
+        ``model_name`` change.
+
+        For a local checkpoint directory this is the size and modification time of every file in it, so that a
+        checkpoint retrained in place does not reuse stale outputs. For models from the HuggingFace Hub it is the
+        commit hash they were loaded from.
+        """
+        if os.path.isdir(model_name):
+            files = sorted(
+                (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                for entry in os.scandir(model_name)
+                if entry.is_file()
+            )
+            return json.dumps(files)
+        return getattr(getattr(self.model.model, "config", None), "_commit_hash", None)
+
+    def _disk_cache_key(self, attacked_text):
+        return hashlib.blake2b(
+            (self._disk_cache_prefix + attacked_text.text).encode("utf-8")
+        ).hexdigest()
+
+    def _call_model_disk_cached(self, attacked_text_list):
+        """Queries model and returns outputs for a list of AttackedText
+        objects, reusing outputs stored in the on-disk cache if it is
+        enabled."""
+        disk_cache = self._get_disk_cache()
+        if disk_cache is None:
+            return self._call_model_uncached(attacked_text_list)
+
+        keys = [self._disk_cache_key(text) for text in attacked_text_list]
+        stored_outputs = {}
+        # Look up a whole model batch per query, staying below SQLite's limit on bound parameters.
+        for i in range(0, len(keys), 512):
+            batch_keys = keys[i : i + 512]
+            placeholders = ", ".join("?" * len(batch_keys))
+            rows = disk_cache.execute(
+                f"SELECT key, output FROM model_text_outputs WHERE key IN ({placeholders})",
+                batch_keys,
+            ).fetchall()
+            for key, output in rows:
+                stored_outputs[key] = json.loads(output)
+
+        missing = [
+            (key, text)
+            for key, text in zip(keys, attacked_text_list)
+            if key not in stored_outputs
+        ]
+        outputs = self._call_model_uncached([text for _, text in missing])
+        rows = []
+        for (key, _), output in zip(missing, outputs):
+            stored_outputs[key] = output
+            # Only plain text is stored, so reading the cache back never
+            # deserializes arbitrary objects.
+            if isinstance(output, str):
+                rows.append((key, json.dumps(output)))
+        if rows:
+            with disk_cache:
+                disk_cache.executemany(
+                    "INSERT OR REPLACE INTO model_text_outputs VALUES (?, ?)", rows
+                )
+        return [stored_outputs[key] for key in keys]
+
     def _call_model(self, attacked_text_list):
         """Gets predictions for a list of ``AttackedText`` objects.
 
@@ -188,7 +302,7 @@ class GoalFunction(ReprMixin, ABC):
         the cache, queries model and stores prediction in cache.
         """
         if not self.use_cache:
-            return self._call_model_uncached(attacked_text_list)
+            return self._call_model_disk_cached(attacked_text_list)
         else:
             uncached_list = []
             for text in attacked_text_list:
@@ -204,7 +318,7 @@ class GoalFunction(ReprMixin, ABC):
                 for text in attacked_text_list
                 if text not in self._call_model_cache
             ]
-            outputs = self._call_model_uncached(uncached_list)
+            outputs = self._call_model_disk_cached(uncached_list)
             for text, output in zip(uncached_list, outputs):
                 self._call_model_cache[text] = output
             all_outputs = [self._call_model_cache[text] for text in attacked_text_list]
@@ -216,12 +330,15 @@ class GoalFunction(ReprMixin, ABC):
             attrs.append("query_budget")
         if self.maximizable:
             attrs.append("maximizable")
+        if self.use_disk_cache:
+            attrs.append("use_disk_cache")
         return attrs
 
     def __getstate__(self):
         state = self.__dict__.copy()
         if self.use_cache:
             state["_call_model_cache"] = self._call_model_cache.get_size()
+        state["_disk_cache"] = None
         return state
 
     def __setstate__(self, state):
@@ -4,6 +4,7 @@ Goal Function for TextToText
 -------------------------------------------------------
 """
 
+import torch
 
 from textattack.goal_function_results import TextToTextGoalFunctionResult
 from textattack.goal_functions import GoalFunction
@@ -22,6 +23,9 @@ class TextToTextGoalFunction(GoalFunction):
 
     def _process_model_outputs(self, _, outputs):
         """Processes and validates a list of model outputs."""
+        if isinstance(outputs, torch.Tensor):
+            # Copy the generated ids to the host in one transfer instead of one per sequence.
+            outputs = outputs.cpu().numpy()
         model_outputs = self.model.tokenizer.batch_decode(outputs,  skip_special_tokens=True, clean_up_tokenization_spaces=True)
         return model_outputs
 
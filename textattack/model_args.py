@@ -8,6 +8,7 @@ from dataclasses import dataclass
 import json
 import os
 
+import torch
 import transformers
 
 import textattack
@@ -137,6 +138,7 @@ class ModelArgs:
     model: str = None
     model_from_file: str = None
     model_from_huggingface: str = None
+    model_dtype: str = None
 
     @classmethod
     def _add_parser_args(cls, parser):
@@ -164,6 +166,15 @@ class ModelArgs:
             required=False,
             help="Name of or path of pre-trained HuggingFace model to load.",
         )
+        parser.add_argument(
+            "--model-dtype",
+            type=str,
+            required=False,
+            default=None,
+            choices=["float32", "float16", "bfloat16"],
+            help="Floating point type to cast the weights of a PyTorch model to after loading. "
+            "Half precision roughly halves the memory traffic of each forward pass on GPU.",
+        )
 
         return parser
 
@@ -308,4 +319,12 @@ class ModelArgs:
         assert isinstance(
             model, textattack.models.wrappers.ModelWrapper
         ), "`model` must be of type `textattack.models.wrappers.ModelWrapper`."
+
+        if args.model_dtype:
+            if not isinstance(model, textattack.models.wrappers.PyTorchModelWrapper):
+                raise TypeError(
+                    f"`--model-dtype` is only supported for PyTorch models, got model wrapper of type {type(model)}."
+                )
+            model.model.to(dtype=getattr(torch, args.model_dtype))
+
         return model
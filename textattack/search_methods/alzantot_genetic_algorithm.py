@@ -24,6 +24,10 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
         max_crossover_retries (int): Maximum number of crossover retries if resulting child fails to pass the constraints.
             Applied only when `post_crossover_check` is set to `True`.
             Setting it to 0 means we immediately take one of the parents at random as the child upon failure.
+        crossover_workers (int): Number of threads used to build the crossover children of a generation. Defaults to 1.
+            Values above 1 overlap the crossover operations of different children. Post-crossover constraint checks still
+            run one at a time, since the constraint caches are shared. The search is then no longer reproducible under a
+            fixed random seed.
     """
 
     def __init__(
@@ -34,6 +38,7 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
         give_up_if_no_improvement=False,
         post_crossover_check=True,
         max_crossover_retries=20,
+        crossover_workers=1,
     ):
         super().__init__(
             pop_size=pop_size,
@@ -42,6 +47,7 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
             give_up_if_no_improvement=give_up_if_no_improvement,
             post_crossover_check=post_crossover_check,
             max_crossover_retries=max_crossover_retries,
+            crossover_workers=crossover_workers,
         )
 
     def _modify_population_member(self, pop_member, new_text, new_result, word_idx):
@@ -74,19 +80,20 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
         Returns:
             Tuple of `AttackedText` and a dictionary of attributes.
         """
-        indices_to_replace = []
-        words_to_replace = []
-        num_candidate_transformations = np.copy(
-            pop_member1.attributes["num_candidate_transformations"]
+        # Take each word (and its number of candidates) from `pop_member2` with probability 0.5.
+        take_from_member2 = np.random.uniform(size=pop_member1.num_words) < 0.5
+        num_candidate_transformations = np.where(
+            take_from_member2,
+            pop_member2.attributes["num_candidate_transformations"],
+            pop_member1.attributes["num_candidate_transformations"],
         )
 
-        for i in range(pop_member1.num_words):
-            if np.random.uniform() < 0.5:
-                indices_to_replace.append(i)
-                words_to_replace.append(pop_member2.words[i])
-                num_candidate_transformations[i] = pop_member2.attributes[
-                    "num_candidate_transformations"
-                ][i]
+        # Words shared by both parents would not change the text, so skip them.
+        words1, words2 = pop_member1.words, pop_member2.words
+        indices_to_replace = [
+            int(i) for i in np.flatnonzero(take_from_member2) if words1[i] != words2[i]
+        ]
+        words_to_replace = [words2[i] for i in indices_to_replace]
 
         new_text = pop_member1.attacked_text.replace_words_at_indices(
             indices_to_replace, words_to_replace
@@ -106,7 +113,7 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
             population as `list[PopulationMember]`
         """
         words = initial_result.attacked_text.words
-        num_candidate_transformations = np.zeros(len(words))
+        num_candidate_transformations = np.zeros(len(words), dtype=int)
         transformed_texts = self.get_transformations(
             initial_result.attacked_text, original_text=initial_result.attacked_text
         )
@@ -125,10 +132,13 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
             num_candidate_transformations[i] = max(
                 num_candidate_transformations[i], epsilon
             )
+        # Every member keeps its own copy of the counts, so store them in the smallest type that fits
+        num_candidate_transformations = num_candidate_transformations.astype(
+            np.min_scalar_type(num_candidate_transformations.max(initial=0))
+        )
 
-        population = []
-        for _ in range(pop_size):
-            pop_member = PopulationMember(
+        population = [
+            PopulationMember(
                 initial_result.attacked_text,
                 initial_result,
                 attributes={
@@ -137,8 +147,7 @@ class AlzantotGeneticAlgorithm(GeneticAlgorithm):
                     )
                 },
             )
-            # Perturb `pop_member` in-place
-            pop_member = self._perturb(pop_member, initial_result)
-            population.append(pop_member)
-
-        return population
+            for _ in range(pop_size)
+        ]
+        # Perturb all members at once so their candidates are scored in shared batches
+        return self._perturb_population(population, initial_result)
@@ -3,15 +3,32 @@ Genetic Algorithm Word Swap
 ====================================
 """
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import threading
 
+import lru
 import numpy as np
-import torch
 
 from textattack.goal_function_results import GoalFunctionResultStatus
 from textattack.search_methods import PopulationBasedSearch, PopulationMember
+from textattack.search_methods.genetic_algorithm_kernels import (
+    best_diff_idx,
+    sample_indices,
+    softmax_select_probs,
+)
 from textattack.shared.validators import transformation_consists_of_word_swaps
 
 
+def _unique_by_text(attacked_texts):
+    """Returns the first `AttackedText` of every distinct `text` in
+    `attacked_texts`, in order."""
+    unique_texts = {}
+    for attacked_text in attacked_texts:
+        unique_texts.setdefault(attacked_text.text, attacked_text)
+    return list(unique_texts.values())
+
+
 class GeneticAlgorithm(PopulationBasedSearch, ABC):
     """Base class for attacking a model with word substiutitions using a
     genetic algorithm.
@@ -26,6 +43,10 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         max_crossover_retries (int): Maximum number of crossover retries if resulting child fails to pass the constraints.
             Applied only when `post_crossover_check` is set to `True`.
             Setting it to 0 means we immediately take one of the parents at random as the child upon failure.
+        crossover_workers (int): Number of threads used to build the crossover children of a generation. Defaults to 1.
+            Values above 1 overlap the crossover operations of different children. Post-crossover constraint checks still
+            run one at a time, since the constraint caches are shared. The search is then no longer reproducible under a
+            fixed random seed.
     """
 
     def __init__(
@@ -36,6 +57,7 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         give_up_if_no_improvement=False,
         post_crossover_check=True,
         max_crossover_retries=20,
+        crossover_workers=1,
     ):
         self.max_iters = max_iters
         self.pop_size = pop_size
@@ -43,9 +65,61 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         self.give_up_if_no_improvement = give_up_if_no_improvement
         self.post_crossover_check = post_crossover_check
         self.max_crossover_retries = max_crossover_retries
+        self.crossover_workers = crossover_workers
 
         # internal flag to indicate if search should end immediately
         self._search_over = False
+        # random generator used for sampling words and parents; reseeded in `perform_search`
+        self._rng = np.random.default_rng()
+        # results of texts already scored during the current search, keyed by `AttackedText.text`
+        self._score_cache = lru.LRU(2**12)
+        # serializes constraint checks made from `crossover_workers` threads
+        self._constraints_lock = threading.Lock()
+
+    def _get_goal_results_cached(self, attacked_texts):
+        """Returns the goal function results of `attacked_texts`, only
+        querying the model for texts whose `text` has not been scored yet
+        during the current search.
+
+        Like `get_goal_results`, the returned results may be cut short if the
+        query budget runs out.
+        Args:
+            attacked_texts (list[AttackedText]): Texts to score.
+        Returns:
+            Tuple of list of `GoalFunctionResult` and whether the search is over.
+        """
+        # Look up cached results before querying, and keep this call's results
+        # locally: a large batch can evict entries from `self._score_cache`
+        # before they are read back.
+        results_by_text = {}
+        for attacked_text in attacked_texts:
+            if attacked_text.text in self._score_cache:
+                results_by_text[attacked_text.text] = self._score_cache[
+                    attacked_text.text
+                ]
+        # Candidates for different members often share a text, so query each text once.
+        uncached_texts = _unique_by_text(
+            t for t in attacked_texts if t.text not in results_by_text
+        )
+        search_over = self._search_over
+        if uncached_texts:
+            new_results, search_over = self.get_goal_results(uncached_texts)
+            for result in new_results:
+                results_by_text[result.attacked_text.text] = result
+                self._score_cache[result.attacked_text.text] = result
+
+        results = []
+        for attacked_text in attacked_texts:
+            if attacked_text.text not in results_by_text:
+                break
+            result = results_by_text[attacked_text.text]
+            if result.attacked_text is not attacked_text:
+                # Same text reached through a different path, e.g. a crossover
+                # child equal to one of its parents.
+                result = copy.copy(result)
+                result.attacked_text = attacked_text
+            results.append(result)
+        return results, search_over
 
     @abstractmethod
     def _modify_population_member(self, pop_member, new_text, new_result, word_idx):
@@ -71,56 +145,114 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         Returns:
             Perturbed `PopulationMember`
         """
-        num_words = pop_member.attacked_text.num_words
-        # `word_select_prob_weights` is a list of values used for sampling one word to transform
-        word_select_prob_weights = np.copy(
-            self._get_word_select_prob_weights(pop_member)
-        )
-        non_zero_indices = np.count_nonzero(word_select_prob_weights)
-        if non_zero_indices == 0:
-            return pop_member
-        iterations = 0
-        while iterations < non_zero_indices:
-            if index:
-                idx = index
-            else:
-                w_select_probs = word_select_prob_weights / np.sum(
-                    word_select_prob_weights
-                )
-                idx = np.random.choice(num_words, 1, p=w_select_probs)[0]
+        return self._perturb_population([pop_member], original_result, indices=[index])[
+            0
+        ]
 
-            transformed_texts = self.get_transformations(
-                pop_member.attacked_text,
-                original_text=original_result.attacked_text,
-                indices_to_modify=[idx],
-            )
+    def _perturb_population(self, pop_members, original_result, indices=None):
+        """Perturb every member of `pop_members` and return the perturbed
+        members. Each member is perturbed as in `_perturb`, but the candidate
+        texts of all members are scored together with a single call to
+        `_get_goal_results_cached` per round of attempts.
 
-            if not len(transformed_texts):
-                iterations += 1
-                continue
+        Args:
+            pop_members (list[PopulationMember]): The population members being perturbed.
+            original_result (GoalFunctionResult): Result of original sample being attacked
+            indices (list[int]): Index of word to perturb for each member, or `None` to pick words at random.
+        Returns:
+            List of perturbed `PopulationMember`
+        """
+        pop_members = list(pop_members)
+        # `word_select_prob_weights` are lists of values used for sampling one word to transform
+        word_select_prob_weights = [
+            np.copy(self._get_word_select_prob_weights(pop_member))
+            for pop_member in pop_members
+        ]
+        non_zero_indices = [np.count_nonzero(w) for w in word_select_prob_weights]
+        # Totals are kept up to date as weights are zeroed, and the normalized
+        # probabilities are only rebuilt after a weight has changed.
+        weight_totals = [np.sum(w) for w in word_select_prob_weights]
+        w_select_probs = [None] * len(pop_members)
+        iterations = [0] * len(pop_members)
+        active = [i for i in range(len(pop_members)) if non_zero_indices[i] > 0]
+
+        while active:
+            # Collect the candidate texts of every active member into one flat batch.
+            candidates = []
+            for i in active:
+                pop_member = pop_members[i]
+                index = indices[i] if indices is not None else None
+                if index is not None:
+                    idx = index
+                else:
+                    if w_select_probs[i] is None:
+                        w_select_probs[i] = (
+                            word_select_prob_weights[i] / weight_totals[i]
+                        )
+                    idx = int(sample_indices(w_select_probs[i], self._rng.random(1))[0])
+
+                transformed_texts = self.get_transformations(
+                    pop_member.attacked_text,
+                    original_text=original_result.attacked_text,
+                    indices_to_modify=[idx],
+                )
 
-            new_results, self._search_over = self.get_goal_results(transformed_texts)
+                if not len(transformed_texts):
+                    iterations[i] += 1
+                    continue
 
-            diff_scores = (
-                torch.Tensor([r.score for r in new_results]) - pop_member.result.score
-            )
-            if len(diff_scores) and diff_scores.max() > 0:
-                idx_with_max_score = diff_scores.argmax()
-                pop_member = self._modify_population_member(
-                    pop_member,
-                    transformed_texts[idx_with_max_score],
-                    new_results[idx_with_max_score],
-                    idx,
-                )
-                return pop_member
+                candidates.append((i, idx, transformed_texts))
 
-            word_select_prob_weights[idx] = 0
-            iterations += 1
+            flat_texts = [t for _, _, texts in candidates for t in texts]
+            if flat_texts:
+                new_results, self._search_over = self._get_goal_results_cached(
+                    flat_texts
+                )
+            else:
+                new_results = []
+
+            perturbed = set()
+            offset = 0
+            for i, idx, transformed_texts in candidates:
+                # `new_results` may be cut short if the query budget runs out.
+                member_results = new_results[offset : offset + len(transformed_texts)]
+                offset += len(transformed_texts)
+
+                scores = np.fromiter(
+                    (r.score for r in member_results),
+                    dtype=np.float32,
+                    count=len(member_results),
+                )
+                if len(scores):
+                    idx_with_max_score, best_diff = best_diff_idx(
+                        scores, np.float32(pop_members[i].result.score)
+                    )
+                    if best_diff > 0:
+                        idx_with_max_score = int(idx_with_max_score)
+                        pop_members[i] = self._modify_population_member(
+                            pop_members[i],
+                            transformed_texts[idx_with_max_score],
+                            member_results[idx_with_max_score],
+                            idx,
+                        )
+                        perturbed.add(i)
+                        continue
+
+                weight_totals[i] -= word_select_prob_weights[i][idx]
+                word_select_prob_weights[i][idx] = 0
+                w_select_probs[i] = None
+                iterations[i] += 1
 
             if self._search_over:
                 break
 
-        return pop_member
+            active = [
+                i
+                for i in active
+                if i not in perturbed and iterations[i] < non_zero_indices[i]
+            ]
+
+        return pop_members
 
     @abstractmethod
     def _crossover_operation(self, pop_member1, pop_member2):
@@ -156,16 +288,20 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
                 if "last_transformation" in parent_text1.attack_attrs
                 else parent_text2
             )
-            passed_constraints = self._check_constraints(
-                new_text, previous_text, original_text=original_text
-            )
+            # The constraints cache of `Attack`, and the caches of many constraints, are not
+            # thread-safe, so checks from different crossover threads run one at a time.
+            with self._constraints_lock:
+                passed_constraints = self._check_constraints(
+                    new_text, previous_text, original_text=original_text
+                )
             return passed_constraints
         else:
             # `new_text` has not been actually transformed, so return True
             return True
 
-    def _crossover(self, pop_member1, pop_member2, original_text):
-        """Generates a crossover between pop_member1 and pop_member2.
+    def _crossover_build(self, pop_member1, pop_member2, original_text):
+        """Generates a crossover between pop_member1 and pop_member2 without
+        querying the model.
 
         If the child fails to satisfy the constraints, we re-try crossover for a fix number of times,
         before taking one of the parents at random as the resulting child.
@@ -174,20 +310,34 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
             pop_member2 (PopulationMember): The second population member.
             original_text (AttackedText): Original text
         Returns:
-            A population member containing the crossover.
+            A population member containing the crossover. Its `result` is `None` until
+            it is scored by `_score_children`.
         """
         x1_text = pop_member1.attacked_text
         x2_text = pop_member2.attacked_text
 
         num_tries = 0
         passed_constraints = False
+        # Texts that have already failed the constraints during this crossover
+        failed_texts = set()
         while num_tries < self.max_crossover_retries + 1:
             new_text, attributes = self._crossover_operation(pop_member1, pop_member2)
 
+            if new_text.text in failed_texts:
+                # Same parents and same text give the same constraint outcome, so skip the check.
+                num_tries += 1
+                continue
+
             replaced_indices = new_text.attack_attrs["newly_modified_indices"]
-            new_text.attack_attrs["modified_indices"] = (
+            # Equivalent to `(x1 - replaced) | (x2 & replaced)`, updating the
+            # difference in place instead of allocating a third set for the union.
+            modified_indices = (
                 x1_text.attack_attrs["modified_indices"] - replaced_indices
-            ) | (x2_text.attack_attrs["modified_indices"] & replaced_indices)
+            )
+            modified_indices |= (
+                x2_text.attack_attrs["modified_indices"] & replaced_indices
+            )
+            new_text.attack_attrs["modified_indices"] = modified_indices
 
             if "last_transformation" in x1_text.attack_attrs:
                 new_text.attack_attrs["last_transformation"] = x1_text.attack_attrs[
@@ -206,6 +356,7 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
             if not self.post_crossover_check or passed_constraints:
                 break
 
+            failed_texts.add(new_text.text)
             num_tries += 1
 
         if self.post_crossover_check and not passed_constraints:
@@ -214,10 +365,50 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
             pop_mem = pop_member1 if np.random.uniform() < 0.5 else pop_member2
             return pop_mem
         else:
-            new_results, self._search_over = self.get_goal_results([new_text])
-            return PopulationMember(
-                new_text, result=new_results[0], attributes=attributes
+            return PopulationMember(new_text, result=None, attributes=attributes)
+
+    def _build_children(self, parents1, parents2, original_text):
+        """Builds the crossover children of every pair of parents in
+        `parents1` and `parents2`, using `crossover_workers` threads.
+
+        Args:
+            parents1 (list[PopulationMember]): First parent of each child.
+            parents2 (list[PopulationMember]): Second parent of each child.
+            original_text (AttackedText): Original text
+        Returns:
+            List of unscored children, in the same order as the parents.
+        """
+        if self.crossover_workers <= 1:
+            return [
+                self._crossover_build(p1, p2, original_text)
+                for p1, p2 in zip(parents1, parents2)
+            ]
+        with ThreadPoolExecutor(max_workers=self.crossover_workers) as executor:
+            return list(
+                executor.map(
+                    lambda pair: self._crossover_build(*pair, original_text),
+                    zip(parents1, parents2),
+                )
+            )
+
+    def _score_children(self, children):
+        """Scores every child produced by `_crossover_build` that does not
+        have a result yet with a single call to `_get_goal_results_cached`.
+
+        Args:
+            children (list[PopulationMember]): Children produced by crossover.
+        Returns:
+            List of children that have a result. Children that could not be scored
+            because the query budget ran out are dropped.
+        """
+        unscored = [child for child in children if child.result is None]
+        if unscored:
+            new_results, self._search_over = self._get_goal_results_cached(
+                [child.attacked_text for child in unscored]
             )
+            for child, result in zip(unscored, new_results):
+                child.result = result
+        return [child for child in children if child.result is not None]
 
     @abstractmethod
     def _initialize_population(self, initial_result, pop_size):
@@ -233,53 +424,69 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
 
     def perform_search(self, initial_result):
         self._search_over = False
+        # Results hold example-specific outputs, so they cannot be reused across searches.
+        self._score_cache.clear()
+        # Seed from the global NumPy state so that `set_seed` keeps attacks reproducible.
+        self._rng = np.random.default_rng(np.random.randint(np.iinfo(np.int32).max))
         population = self._initialize_population(initial_result, self.pop_size)
         pop_size = len(population)
         current_score = initial_result.score
+        elite = population[0]
 
         for i in range(self.max_iters):
-            population = sorted(population, key=lambda x: x.result.score, reverse=True)
+            # Only the best member is carried over, so there is no need to sort the population.
+            elite = max(population, key=lambda x: x.result.score)
 
             if (
                 self._search_over
-                or population[0].result.goal_status
-                == GoalFunctionResultStatus.SUCCEEDED
+                or elite.result.goal_status == GoalFunctionResultStatus.SUCCEEDED
             ):
                 break
 
-            if population[0].result.score > current_score:
-                current_score = population[0].result.score
+            if elite.result.score > current_score:
+                current_score = elite.result.score
             elif self.give_up_if_no_improvement:
                 break
 
-            pop_scores = torch.Tensor([pm.result.score for pm in population])
-            logits = ((-pop_scores) / self.temp).exp()
-            select_probs = (logits / logits.sum()).cpu().numpy()
+            pop_scores = np.fromiter(
+                (pm.result.score for pm in population),
+                dtype=np.float32,
+                count=len(population),
+            )
+            select_probs = softmax_select_probs(pop_scores, np.float32(self.temp))
+
+            # Draw both parents of every child in a single call.
+            parent_idx = sample_indices(
+                select_probs, self._rng.random(2 * (pop_size - 1))
+            )
+            parent1_idx = parent_idx[: pop_size - 1]
+            parent2_idx = parent_idx[pop_size - 1 :]
 
-            parent1_idx = np.random.choice(pop_size, size=pop_size - 1, p=select_probs)
-            parent2_idx = np.random.choice(pop_size, size=pop_size - 1, p=select_probs)
+            children = self._build_children(
+                [population[idx] for idx in parent1_idx],
+                [population[idx] for idx in parent2_idx],
+                initial_result.attacked_text,
+            )
+            children = self._score_children(children)
 
-            children = []
-            for idx in range(pop_size - 1):
-                child = self._crossover(
-                    population[parent1_idx[idx]],
-                    population[parent2_idx[idx]],
-                    initial_result.attacked_text,
-                )
-                if self._search_over:
-                    break
+            # `search_over` may already be set by scoring the crossover children.
+            if not self._search_over:
+                children = self._perturb_population(children, initial_result)
 
-                child = self._perturb(child, initial_result)
-                children.append(child)
+            population = [elite] + children
 
-                # We need two `search_over` checks b/c value might change both in
-                # `crossover` method and `perturb` method.
-                if self._search_over:
-                    break
+        return elite.result
 
-            population = [population[0]] + children
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_score_cache"] = self._score_cache.get_size()
+        state["_constraints_lock"] = None
+        return state
 
-        return population[0].result
+    def __setstate__(self, state):
+        self.__dict__ = state
+        self._score_cache = lru.LRU(state["_score_cache"])
+        self._constraints_lock = threading.Lock()
 
     def check_transformation_compatibility(self, transformation):
         """The genetic algorithm is specifically designed for word
@@ -291,7 +498,7 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
         return True
 
     def extra_repr_keys(self):
-        return [
+        attrs = [
             "pop_size",
             "max_iters",
             "temp",
@@ -299,3 +506,6 @@ class GeneticAlgorithm(PopulationBasedSearch, ABC):
             "post_crossover_check",
             "max_crossover_retries",
         ]
+        if self.crossover_workers > 1:
+            attrs.append("crossover_workers")
+        return attrs
@@ -0,0 +1,48 @@
+"""
+Genetic Algorithm Kernels
+====================================
+
+Numeric helpers used by :class:`~textattack.search_methods.GeneticAlgorithm` for parent selection and perturbation.
+They are compiled with Numba when it is installed and run as plain NumPy otherwise.
+Compiled kernels are not cached on disk, since Numba would write the cache into the installed package.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ModuleNotFoundError:
+
+    def njit(*args, **kwargs):
+        """Fallback for ``numba.njit`` that leaves the function uncompiled."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(fastmath=True)
+def softmax_select_probs(scores, temp):
+    """Returns the probability of selecting each population member as a
+    parent given the `scores` of the population and the softmax temperature
+    `temp`."""
+    logits = -scores / temp
+    # Shifting by the maximum keeps `exp` from overflowing for small temperatures.
+    exps = np.exp(logits - logits.max())
+    return exps / exps.sum()
+
+
+@njit
+def sample_indices(probs, uniforms):
+    """Draws one index per value in `uniforms` (uniform samples in [0, 1))
+    from the distribution `probs` by inverting its cumulative sum."""
+    cdf = np.cumsum(probs)
+    indices = np.searchsorted(cdf, uniforms * cdf[-1], side="right")
+    return np.minimum(indices, len(probs) - 1)
+
+
+@njit
+def best_diff_idx(scores, baseline):
+    """Returns the index of the highest score in the non-empty array `scores`
+    and how much it improves over `baseline`."""
+    best = np.argmax(scores)
+    return best, scores[best] - baseline
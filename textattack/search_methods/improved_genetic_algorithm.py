@@ -27,6 +27,10 @@ class ImprovedGeneticAlgorithm(GeneticAlgorithm):
             Applied only when `post_crossover_check` is set to `True`.
             Setting it to 0 means we immediately take one of the parents at random as the child upon failure.
         max_replace_times_per_index (int):  The maximum times words at the same index can be replaced in improved genetic algorithm.
+        crossover_workers (int): Number of threads used to build the crossover children of a generation. Defaults to 1.
+            Values above 1 overlap the crossover operations of different children. Post-crossover constraint checks still
+            run one at a time, since the constraint caches are shared. The search is then no longer reproducible under a
+            fixed random seed.
     """
 
     def __init__(
@@ -38,6 +42,7 @@ class ImprovedGeneticAlgorithm(GeneticAlgorithm):
         post_crossover_check=True,
         max_crossover_retries=20,
         max_replace_times_per_index=5,
+        crossover_workers=1,
     ):
         super().__init__(
             pop_size=pop_size,
@@ -46,6 +51,7 @@ class ImprovedGeneticAlgorithm(GeneticAlgorithm):
             give_up_if_no_improvement=give_up_if_no_improvement,
             post_crossover_check=post_crossover_check,
             max_crossover_retries=max_crossover_retries,
+            crossover_workers=crossover_workers,
         )
 
         self.max_replace_times_per_index = max_replace_times_per_index
@@ -55,7 +61,9 @@ class ImprovedGeneticAlgorithm(GeneticAlgorithm):
         `new_result`, and `num_replacements_left` altered appropriately for
         given `word_idx`"""
         num_replacements_left = np.copy(pop_member.attributes["num_replacements_left"])
-        num_replacements_left[word_idx] -= 1
+        # The counts are unsigned, so make sure they never wrap around below zero
+        if num_replacements_left[word_idx] > 0:
+            num_replacements_left[word_idx] -= 1
         return PopulationMember(
             new_text,
             result=new_result,
@@ -78,20 +86,25 @@ class ImprovedGeneticAlgorithm(GeneticAlgorithm):
         Returns:
             Tuple of `AttackedText` and a dictionary of attributes.
         """
-        indices_to_replace = []
-        words_to_replace = []
-        num_replacements_left = np.copy(pop_member1.attributes["num_replacements_left"])
-
         # To better simulate the reproduction and biological crossover,
         # IGA randomly cut the text from two parents and concat two fragments into a new text
         # rather than randomly choose a word of each position from the two parents.
         crossover_point = np.random.randint(0, pop_member1.num_words)
-        for i in range(crossover_point, pop_member1.num_words):
-            indices_to_replace.append(i)
-            words_to_replace.append(pop_member2.words[i])
-            num_replacements_left[i] = pop_member2.attributes["num_replacements_left"][
-                i
-            ]
+        num_replacements_left = np.concatenate(
+            (
+                pop_member1.attributes["num_replacements_left"][:crossover_point],
+                pop_member2.attributes["num_replacements_left"][crossover_point:],
+            )
+        )
+
+        # Words shared by both parents would not change the text, so skip them.
+        words1, words2 = pop_member1.words, pop_member2.words
+        indices_to_replace = [
+            i
+            for i in range(crossover_point, pop_member1.num_words)
+            if words1[i] != words2[i]
+        ]
+        words_to_replace = [words2[i] for i in indices_to_replace]
 
         new_text = pop_member1.attacked_text.replace_words_at_indices(
             indices_to_replace, words_to_replace
@@ -109,20 +122,23 @@ class ImprovedGeneticAlgorithm(GeneticAlgorithm):
         """
         words = initial_result.attacked_text.words
         # For IGA, `num_replacements_left` represents the number of times the word at each index can be modified
-        num_replacements_left = np.array(
-            [self.max_replace_times_per_index] * len(words)
+        num_replacements_left = np.full(
+            len(words),
+            self.max_replace_times_per_index,
+            dtype=np.min_scalar_type(self.max_replace_times_per_index),
         )
-        population = []
-
         # IGA initializes the first population by replacing each word by its optimal synonym
-        for idx in range(len(words)):
-            pop_member = PopulationMember(
+        population = [
+            PopulationMember(
                 initial_result.attacked_text,
                 initial_result,
                 attributes={"num_replacements_left": np.copy(num_replacements_left)},
             )
-            pop_member = self._perturb(pop_member, initial_result, index=idx)
-            population.append(pop_member)
+            for _ in range(len(words))
+        ]
+        population = self._perturb_population(
+            population, initial_result, indices=list(range(len(words)))
+        )
 
         return population[:pop_size]
 